@@ -4,8 +4,8 @@ from .rewards import ClipRewards
 from .vision import FrameStack
 
 class DeepmindAtariBody(Body):
-    def __init__(self, agent, lazy_frames=False, episodic_lives=True, frame_stack=4):
-        agent = FrameStack(agent, lazy=lazy_frames, size=frame_stack)
+    def __init__(self, agent, lazy_frames=False, episodic_lives=True, frame_stack=4, packed_frames=False):
+        agent = FrameStack(agent, lazy=lazy_frames, size=frame_stack, packed=packed_frames)
         agent = ClipRewards(agent)
         if episodic_lives:
             agent = EpisodicLives(agent)
@@ -3,22 +3,68 @@ from all.core import State, StateTensor
 from ._body import Body
 
 class FrameStack(Body):
-    def __init__(self, agent, size=4, lazy=False):
+    def __init__(self, agent, size=4, lazy=False, packed=False):
         super().__init__(agent)
         self._frames = []
         self._size = size
         self._lazy = lazy
+        self._buffer = None
+        self._orders = None
+        self._head = 0
+        self._packed = packed
+        self._packed_buffer = None
+        self._shifts = None
 
     def process_state(self, state):
-        if not self._frames:
-            self._frames = [state.observation] * self._size
-        else:
-            self._frames = self._frames[1:] + [state.observation]
         if self._lazy:
+            if not self._frames:
+                self._frames = [state.observation] * self._size
+            else:
+                self._frames = self._frames[1:] + [state.observation]
             return LazyState.from_state(state, self._frames)
+        if self._packed:
+            return state.update('observation', self._pack(state.observation))
+        obs = state.observation
+        if self._buffer is None:
+            self._allocate(obs)
+        else:
+            # overwrite the oldest slot in place instead of
+            # allocating a fresh stack of frames every step
+            self._buffer[self._head].copy_(obs)
+            self._head = (self._head + 1) % self._size
+        stacked = self._buffer.index_select(0, self._orders[self._head])
         if isinstance(state, StateTensor):
-            return state.update('observation', torch.cat(self._frames, dim=1))
-        return state.update('observation', torch.cat(self._frames, dim=0))
+            return state.update('observation', stacked.transpose(0, 1).flatten(1, 2))
+        return state.update('observation', stacked.flatten(0, 1))
+
+    def _allocate(self, obs):
+        self._buffer = torch.empty((self._size, *obs.shape), dtype=obs.dtype, device=obs.device)
+        self._buffer.copy_(obs)
+        self._orders = [
+            torch.tensor([(head + i) % self._size for i in range(self._size)], device=obs.device)
+            for head in range(self._size)
+        ]
+        self._head = 0
+
+    def _pack(self, obs):
+        # keep the whole stack in one int32 per pixel, newest frame in the
+        # low byte, so the persistent stack state is 4x smaller and each
+        # update is a single shift-or (the SEED RL packing scheme)
+        frame = obs.to(torch.int32)
+        if self._packed_buffer is None:
+            if obs.dtype != torch.uint8 or self._size > 4:
+                raise ValueError('packed frame stacks require uint8 frames and size <= 4')
+            self._packed_buffer = frame
+            for _ in range(self._size - 1):
+                self._packed_buffer = (self._packed_buffer << 8) | frame
+            self._shifts = [8 * i for i in range(self._size - 1, -1, -1)]
+        else:
+            self._packed_buffer = (self._packed_buffer << 8) | frame
+        packed = self._packed_buffer
+        return torch.cat(
+            [(packed >> shift) & 0xFF for shift in self._shifts],
+            dim=-3
+        ).to(torch.uint8)
 
 class LazyState(State):
     @classmethod
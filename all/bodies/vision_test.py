@@ -0,0 +1,88 @@
+import unittest
+import torch
+import torch_testing as tt
+from all.core import State, StateTensor
+from all.bodies import FrameStack
+
+
+class TestAgent():
+    def __init__(self):
+        self.last_state = None
+
+    def act(self, state):
+        self.last_state = state
+        return torch.zeros(1)
+
+
+def _frame(value):
+    return torch.full((1, 2, 2), value, dtype=torch.uint8)
+
+
+class FrameStackTest(unittest.TestCase):
+    def setUp(self):
+        self.test_agent = TestAgent()
+
+    def test_single_env(self):
+        agent = FrameStack(self.test_agent, size=4)
+        agent.act(State(_frame(0)))
+        tt.assert_equal(
+            self.test_agent.last_state.observation,
+            torch.cat([_frame(0)] * 4, dim=0)
+        )
+        agent.act(State(_frame(1)))
+        tt.assert_equal(
+            self.test_agent.last_state.observation,
+            torch.cat([_frame(0), _frame(0), _frame(0), _frame(1)], dim=0)
+        )
+
+    def test_wrap_around(self):
+        # more steps than the stack size, so the ring buffer head wraps
+        agent = FrameStack(self.test_agent, size=4)
+        for i in range(6):
+            agent.act(State(_frame(i)))
+        tt.assert_equal(
+            self.test_agent.last_state.observation,
+            torch.cat([_frame(i) for i in (2, 3, 4, 5)], dim=0)
+        )
+
+    def test_no_aliasing(self):
+        # stored observations must not change as the buffer is overwritten
+        agent = FrameStack(self.test_agent, size=4)
+        agent.act(State(_frame(0)))
+        old_observation = self.test_agent.last_state.observation
+        agent.act(State(_frame(1)))
+        tt.assert_equal(old_observation, torch.cat([_frame(0)] * 4, dim=0))
+
+    def test_multi_env(self):
+        agent = FrameStack(self.test_agent, size=4)
+        frames = [torch.randint(255, (2, 1, 2, 2), dtype=torch.uint8) for _ in range(5)]
+        for frame in frames:
+            agent.act(StateTensor(frame, (2,)))
+        tt.assert_equal(
+            self.test_agent.last_state.observation,
+            torch.cat([frames[1], frames[2], frames[3], frames[4]], dim=1)
+        )
+
+    def test_packed_matches_unpacked(self):
+        for size in (3, 4):
+            plain_agent = TestAgent()
+            packed_agent = TestAgent()
+            plain = FrameStack(plain_agent, size=size)
+            packed = FrameStack(packed_agent, size=size, packed=True)
+            for _ in range(6):
+                frame = torch.randint(255, (1, 2, 2), dtype=torch.uint8)
+                plain.act(State(frame))
+                packed.act(State(frame))
+                tt.assert_equal(
+                    packed_agent.last_state.observation,
+                    plain_agent.last_state.observation
+                )
+
+    def test_packed_requires_uint8(self):
+        agent = FrameStack(self.test_agent, packed=True)
+        with self.assertRaises(ValueError):
+            agent.act(State(torch.randn(1, 2, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,23 @@
+import math
 import numpy as np
 import torch
 
 __all__ = ['State', 'StateTensor']
 
+def _to_tensor(x, dtype=None):
+    # wrap the observation without copying when it is already
+    # a contiguous array of the requested (or native) dtype
+    a = np.ascontiguousarray(x)
+    if dtype is not None and a.dtype != np.dtype(dtype):
+        a = a.astype(dtype, copy=False)
+    return torch.from_numpy(a)
+
+@torch.jit.script
+def _uint8_to_float(x):
+    # fuse the widening cast and the 1/255 normalization into
+    # a single elementwise pass over the uint8 screen buffer
+    return x.to(torch.float32).mul_(1. / 255.)
+
 class State(dict):
     def __init__(self, x, device='cpu', **kwargs):
         if not isinstance(x, dict):
@@ -11,29 +26,82 @@ class State(dict):
             x[k] = v
         if 'observation' not in x:
             raise Exception('State must contain an observation')
-        if 'reward' not in x:
-            x['reward'] = 0.
-        if 'done' not in x:
-            x['done'] = False
-        if 'mask' not in x:
-            x['mask'] = 1. - x['done']
+        # update() and friends pass fully-populated dicts: skip the
+        # per-key defaulting entirely in that common case
+        if not ('reward' in x and 'done' in x and 'mask' in x):
+            if 'reward' not in x:
+                x['reward'] = 0.
+            if 'done' not in x:
+                x['done'] = False
+            if 'mask' not in x:
+                x['mask'] = 1. - x['done']
         super().__init__(x)
         self.shape = ()
         self.device = device
 
     @classmethod
-    def from_list(cls, list_of_states):
-        device = list_of_states[0].device
-        shape = (len(list_of_states), *list_of_states[0].shape)
+    def _from_validated(cls, x, device='cpu'):
+        # fast path for dicts that already carry observation,
+        # reward, done and mask: skip kwargs handling and defaulting
+        state = dict.__new__(cls)
+        dict.__init__(state, x)
+        state.shape = ()
+        state.device = device
+        return state
+
+    @classmethod
+    def from_list(cls, list_of_states, device=None):
+        first = list_of_states[0]
+        if device is None:
+            device = first.device
+        target = torch.device(device)
+        shape = (len(list_of_states), *first.shape)
+        tensor_type = torch.Tensor
+        raw = dict.__getitem__
         x = {}
-        for key in list_of_states[0].keys():
-            v = list_of_states[0][key]
+        # classify each key once from the first state, then batch
+        # with a single tight comprehension per key
+        for key in first.keys():
+            v = raw(first, key)
             try:
-                if torch.is_tensor(v):
-                    x[key] = torch.stack([state[key] for state in list_of_states])
+                if isinstance(v, tensor_type):
+                    # stack into a single preallocated buffer, pinned so that
+                    # the result can be moved to the GPU with non_blocking=True
+                    pin = v.device.type == 'cpu' and torch.cuda.is_available()
+                    out = torch.empty(
+                        (len(list_of_states), *v.shape),
+                        dtype=v.dtype,
+                        device=v.device,
+                        pin_memory=pin
+                    )
+                    out = torch.stack([state[key] for state in list_of_states], out=out)
+                    # stacking happens on the source device; the pinned
+                    # buffer makes the transfer to the target asynchronous
+                    x[key] = out if out.device == target else out.to(target, non_blocking=pin)
+                elif isinstance(v, list) and v and isinstance(v[0], tensor_type):
+                    # lazy frame stacks (see all.bodies.vision.LazyState):
+                    # concatenate each state's frames directly into the batch
+                    # buffer rather than materializing every state separately
+                    frame_shape = (sum(f.shape[0] for f in v), *v[0].shape[1:])
+                    pin = v[0].device.type == 'cpu' and torch.cuda.is_available()
+                    out = torch.empty(
+                        (len(list_of_states), *frame_shape),
+                        dtype=v[0].dtype,
+                        device=v[0].device,
+                        pin_memory=pin
+                    )
+                    for i, state in enumerate(list_of_states):
+                        frames = raw(state, key)
+                        if isinstance(frames, tensor_type):
+                            out[i] = frames
+                        else:
+                            torch.cat(frames, out=out[i])
+                    x[key] = out if out.device == target else out.to(target, non_blocking=pin)
                 else:
                     x[key] = torch.tensor([state[key] for state in list_of_states], device=device)
-            except: # # pylint: disable=bare-except
+            except (KeyError, TypeError, ValueError, RuntimeError):
+                # drop keys that cannot be batched, including keys some
+                # states lack (e.g. info keys gym adds on certain steps only)
                 pass
         return StateTensor(x, shape, device=device)
 
@@ -41,7 +109,11 @@ class State(dict):
         return self.apply_mask(self.as_output(model(*[self.as_input(key) for key in keys])))
 
     def as_input(self, key):
-        return self[key].unsqueeze(0)
+        value = self[key].unsqueeze(0)
+        if value.dtype == torch.uint8:
+            # normalize uint8 screen buffers at the network boundary
+            return _uint8_to_float(value)
+        return value.float()
 
     def as_output(self, tensor):
         return tensor.squeeze(0)
@@ -50,32 +122,19 @@ class State(dict):
         return tensor * self.mask
 
     def update(self, key, value):
-        x = {}
-        for k in self.keys():
-            if not k == key:
-                x[k] = super().__getitem__(k)
+        x = dict(self)
         x[key] = value
-        return self.__class__(x, device=self.device)
+        return self.__class__._from_validated(x, device=self.device) # pylint: disable=protected-access
 
     @classmethod
-    def from_gym(cls, state, device='cpu', dtype=np.float32):
+    def from_gym(cls, state, device='cpu', dtype=None):
         if not isinstance(state, tuple):
             return State({
-                'observation': torch.from_numpy(
-                    np.array(
-                        state,
-                        dtype=dtype
-                    ),
-                ).to(device)
+                'observation': _to_tensor(state, dtype).to(device)
             }, device=device)
 
         observation, reward, done, info = state
-        observation = torch.from_numpy(
-            np.array(
-                observation,
-                dtype=dtype
-            ),
-        ).to(device)
+        observation = _to_tensor(observation, dtype).to(device)
         x = {
             'observation': observation,
             'reward': float(reward),
@@ -113,46 +172,93 @@ class StateTensor(State):
             x[k] = v
         if 'observation' not in x:
             raise Exception('StateTensor must contain an observation')
-        if 'reward' not in x:
-            x['reward'] = torch.zeros(shape, device=device)
-        if 'done' not in x:
-            x['done'] = torch.tensor([False] * np.prod(shape), device=device).view(shape)
-        if 'mask' not in x:
-            x['mask'] = 1. - x['done'].float()
+        if not ('reward' in x and 'done' in x and 'mask' in x):
+            if 'reward' not in x:
+                x['reward'] = torch.zeros(shape, device=device)
+            if 'done' not in x:
+                x['done'] = torch.zeros(shape, dtype=torch.bool, device=device)
+                if 'mask' not in x:
+                    x['mask'] = torch.ones(shape, dtype=torch.float32, device=device)
+            if 'mask' not in x:
+                x['mask'] = 1. - x['done'].float()
         super().__init__(x, device=device)
         self.shape = shape
+        self._dims = len(shape)
+        self._n = math.prod(shape)
+        self._tensor_keys = tuple(
+            k for k, v in x.items()
+            if isinstance(v, torch.Tensor) and v.shape[:len(shape)] == shape
+        )
+
+    @classmethod
+    def _from_validated_with_shape(cls, x, shape, device='cpu'):
+        # named differently from State._from_validated because the extra
+        # shape argument would otherwise shadow the parent's device position
+        dims = len(shape)
+        state = dict.__new__(cls)
+        dict.__init__(state, x)
+        state.shape = shape
+        state.device = device
+        state._dims = dims
+        state._n = math.prod(shape)
+        state._tensor_keys = tuple(
+            k for k, v in x.items()
+            if isinstance(v, torch.Tensor) and v.shape[:dims] == shape
+        )
+        return state
 
     def update(self, key, value):
-        x = {}
-        for k in self.keys():
-            if not k == key:
-                x[k] = super().__getitem__(k)
+        x = dict(self)
         x[key] = value
-        return self.__class__(x, self.shape, device=self.device)
+        return self.__class__._from_validated_with_shape(x, self.shape, device=self.device) # pylint: disable=protected-access
 
     def as_input(self, key):
         value = self[key]
-        return value.view((np.prod(self.shape), *value.shape[len(self.shape):])).float()
+        value = value.reshape((self._n, *value.shape[self._dims:]))
+        if value.dtype == torch.uint8:
+            return _uint8_to_float(value)
+        return value.float()
 
     def as_output(self, tensor):
         return tensor.view((*self.shape, *tensor.shape[1:]))
 
     def apply_mask(self, tensor):
-        return tensor * self.mask.unsqueeze(-1) # pylint: disable=no-member
+        # pylint: disable=no-member
+        mask = self.mask
+        if mask.dtype == torch.bool:
+            # a fill needs no multiplier, halving the ALU work of the
+            # broadcast multiply used for float masks
+            return tensor.masked_fill(~mask.unsqueeze(-1), 0.)
+        return tensor * mask.unsqueeze(-1)
+
+    def to(self, device, non_blocking=True):
+        if torch.device(device) == torch.device(self.device):
+            return self
+        # tensors built by from_list live in pinned memory, so these
+        # copies can overlap with GPU compute when non_blocking=True
+        x = {
+            k: v.to(device, non_blocking=non_blocking) if isinstance(v, torch.Tensor) else v
+            for k, v in self.items()
+        }
+        return StateTensor(x, self.shape, device=device)
 
     def flatten(self):
-        n = np.prod(self.shape)
-        dims = len(self.shape)
+        n = self._n
+        if self.shape == (n,):
+            return self
+        dims = self._dims
         x = {}
         for k, v in self.items():
-            x[k] = v.view((n, *v.shape[dims:]))
+            x[k] = v.reshape((n, *v.shape[dims:]))
         return StateTensor(x, (n,), device=self.device)
 
     def view(self, shape):
-        dims = len(self.shape)
+        if shape == self.shape:
+            return self
+        dims = self._dims
         x = {}
         for k, v in self.items():
-            x[k] = v.view((*shape, *v.shape[dims:]))
+            x[k] = v.reshape((*shape, *v.shape[dims:]))
         return StateTensor(x, shape, device=self.device)
 
     @property
@@ -174,19 +280,25 @@ class StateTensor(State):
     def __getitem__(self, key):
         if isinstance(key, slice):
             shape = self['mask'][key].shape
-            return StateTensor({k:v[key] for (k, v) in self.items()}, shape, device=self.device)
+            return StateTensor._from_validated_with_shape(
+                {k:v[key] for (k, v) in self.items()}, shape, device=self.device)
         if isinstance(key, int):
-            return State({k:v[key] for (k, v) in self.items()}, device=self.device)
-        if torch.is_tensor(key):
-            # some things may get los
-            d = {}
+            return State._from_validated({k:v[key] for (k, v) in self.items()}, device=self.device)
+        if isinstance(key, torch.Tensor):
+            # non-tensor values cannot be indexed and are dropped
             shape = self['mask'][key].shape
-            for (k, v) in self.items():
-                try:
-                    d[k] = v[key]
-                except: # pylint: disable=bare-except
-                    pass
-            return self.__class__(d, shape, device=self.device)
+            # index_select rejects negative indices, so those
+            # fall back to plain (but slower) tensor indexing
+            index_select = (
+                key.dim() == 1
+                and key.dtype == torch.int64
+                and (key.numel() == 0 or bool(key.min() >= 0))
+            )
+            d = {}
+            for k in self._tensor_keys:
+                v = dict.__getitem__(self, k)
+                d[k] = v.index_select(0, key) if index_select else v[key]
+            return self.__class__._from_validated_with_shape(d, shape, device=self.device) # pylint: disable=protected-access
         try:
             value = super().__getitem__(key)
         except KeyError:
@@ -129,6 +129,15 @@ class StateTensorTest(unittest.TestCase):
         tensor = torch.randn(3, 5)
         self.assertEqual(state.as_output(tensor).shape, (3, 5))
 
+    def test_apply_mask_bool(self):
+        observation = torch.randn(3, 4)
+        state = StateTensor(observation, (3,), mask=torch.tensor([True, False, True]))
+        tensor = torch.randn(3, 2)
+        tt.assert_equal(
+            state.apply_mask(tensor),
+            tensor * torch.tensor([[1.], [0.], [1.]])
+        )
+
     def test_auto_mask(self):
         observation = torch.randn(3, 4)
         state = StateTensor({
@@ -151,6 +160,21 @@ class StateTensorTest(unittest.TestCase):
         tt.assert_equal(state.done, torch.zeros((5, 3, 2)).bool())
         tt.assert_equal(state.reward, torch.zeros((5, 3, 2)))
 
+    def test_to_device(self):
+        observation = torch.randn(3, 4)
+        state = StateTensor(observation, (3,), label='dummy')
+        # the same device returns the state itself, no copies
+        self.assertIs(state.to('cpu'), state)
+        # a distinct device identifier forces the per-key copy path
+        moved = state.to(torch.device('cpu', 0))
+        tt.assert_equal(moved.observation, observation)
+        self.assertEqual(moved.shape, (3,))
+        self.assertEqual(moved['label'], 'dummy')
+        if torch.cuda.is_available():
+            state_cuda = state.to('cuda')
+            tt.assert_equal(state_cuda.observation.cpu(), observation) # pylint: disable=no-member
+            self.assertEqual(state_cuda['label'], 'dummy')
+
     def test_view(self):
         state = StateTensor.from_list([
             State(torch.randn((3, 4))),
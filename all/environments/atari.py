@@ -1,6 +1,7 @@
 import gym
 from .gym import GymEnvironment
 from .atari_wrappers import (
+    GrayscaleEnv,
     NoopResetEnv,
     MaxAndSkipEnv,
     FireResetEnv,
@@ -17,6 +18,7 @@ class AtariEnvironment(GymEnvironment):
         # construct the environment
         env = gym.make(name + "NoFrameskip-v4")
         # apply a subset of wrappers
+        env = GrayscaleEnv(env)
         env = NoopResetEnv(env, noop_max=30)
         env = MaxAndSkipEnv(env)
         env = FireResetEnv(env)
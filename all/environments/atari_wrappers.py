@@ -84,6 +84,31 @@ class FireResetEnv(gym.Wrapper):
         return lives < self.lives and lives > 0
 
 
+class GrayscaleEnv(gym.ObservationWrapper):
+    def __init__(self, env):
+        '''
+        Read grayscale frames directly from the ALE.
+
+        The ALE computes the luminance without materializing the
+        intermediate 210x160x3 RGB buffer, which is both faster
+        and 3x smaller than fetching RGB and converting with cv2.
+        '''
+        super().__init__(env)
+        height, width = env.observation_space.shape[0], env.observation_space.shape[1]
+        self.observation_space = gym.spaces.Box(
+            low=0,
+            high=255,
+            shape=(height, width, 1),
+            dtype=np.uint8,
+        )
+
+    def observation(self, observation):
+        frame = self.env.unwrapped.ale.getScreenGrayscale()
+        if frame.ndim == 2:
+            frame = np.expand_dims(frame, -1)
+        return frame
+
+
 class MaxAndSkipEnv(gym.Wrapper):
     def __init__(self, env, skip=4):
         '''Return only every `skip`-th frame'''
@@ -150,7 +175,7 @@ class WarpFrame(gym.ObservationWrapper):
         else:
             frame = obs[self._key]
 
-        if self._grayscale:
+        if self._grayscale and frame.shape[-1] == 3:
             frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
         frame = cv2.resize(
             frame, (self._width, self._height), interpolation=cv2.INTER_AREA
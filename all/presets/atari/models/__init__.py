@@ -3,7 +3,6 @@ from all import nn
 
 def nature_dqn(env, frames=4):
     return nn.Sequential(
-        nn.Scale(1/255),
         nn.Conv2d(frames, 32, 8, stride=4),
         nn.ReLU(),
         nn.Conv2d(32, 64, 4, stride=2),
@@ -18,7 +17,6 @@ def nature_dqn(env, frames=4):
 
 def nature_ddqn(env, frames=4):
     return nn.Sequential(
-        nn.Scale(1/255),
         nn.Conv2d(frames, 32, 8, stride=4),
         nn.ReLU(),
         nn.Conv2d(32, 64, 4, stride=2),
@@ -42,7 +40,6 @@ def nature_ddqn(env, frames=4):
 
 def nature_features(frames=4):
     return nn.Sequential(
-        nn.Scale(1/255),
         nn.Conv2d(frames, 32, 8, stride=4),
         nn.ReLU(),
         nn.Conv2d(32, 64, 4, stride=2),
@@ -62,7 +59,6 @@ def nature_policy_head(env):
 
 def nature_c51(env, frames=4, atoms=51):
     return nn.Sequential(
-        nn.Scale(1/255),
         nn.Conv2d(frames, 32, 8, stride=4),
         nn.ReLU(),
         nn.Conv2d(32, 64, 4, stride=2),
@@ -77,7 +73,6 @@ def nature_c51(env, frames=4, atoms=51):
 
 def nature_rainbow(env, frames=4, hidden=512, atoms=51, sigma=0.5):
     return nn.Sequential(
-        nn.Scale(1/255),
         nn.Conv2d(frames, 32, 8, stride=4),
         nn.ReLU(),
         nn.Conv2d(32, 64, 4, stride=2),